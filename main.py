@@ -1,11 +1,15 @@
 import os
-import fitz  # PyMuPDF
-from docx import Document
+import io
+import hashlib
 import streamlit as st
-import json
+import orjson
+from pydantic import BaseModel
 from dotenv import load_dotenv
 import google.generativeai as genai
-import time
+import diskcache
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from resume_io import extract_text_from_pdf, extract_text_from_docx, save_docx
 
 # Load API Keys from .env
 load_dotenv()
@@ -19,90 +23,148 @@ if not GEMINI_API_KEY:
     st.info("For local development: Add GEMINI_API_KEY to your .env file")
     st.stop()
 
-# Configure Gemini AI
-genai.configure(api_key=GEMINI_API_KEY)
-model = genai.GenerativeModel('gemini-1.5-flash')
+# Gemini models: the streamed resume and guidance are what the user waits on,
+# while the structured feedback runs in the background on a cheaper model
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
+GEMINI_FEEDBACK_MODEL = os.getenv("GEMINI_FEEDBACK_MODEL", "gemini-1.5-flash-8b")
 
-# Resume Extraction Functions
+def warm_up_model(model):
+    """Open the connection to Gemini ahead of the first real request"""
+    try:
+        model.count_tokens("ping")
+    except Exception:
+        pass  # The first real request will surface any connection problem
 
-def extract_text_from_pdf(pdf_file):
-    doc = fitz.open(stream=pdf_file.read(), filetype="pdf")
-    return "\n".join(page.get_text() for page in doc)
+# Configure Gemini AI once per process rather than on every rerun
+@st.cache_resource
+def get_model(model_name):
+    genai.configure(api_key=GEMINI_API_KEY)
+    model = genai.GenerativeModel(model_name)
+    threading.Thread(target=warm_up_model, args=(model,), daemon=True).start()
+    return model
 
-def extract_text_from_docx(docx_file):
-    document = Document(docx_file)
-    return "\n".join(p.text for p in document.paragraphs)
+# Create both models on the script thread, since the feedback call later runs in a worker thread
+get_model(GEMINI_MODEL)
+get_model(GEMINI_FEEDBACK_MODEL)
 
-def save_docx(text, output_path):
-    doc = Document()
-    for line in text.strip().splitlines():
-        doc.add_paragraph(line)
-    doc.save(output_path)
+# Gemini response cache, shared across sessions and restarts
+LLM_CACHE_DIR = "./.llm_cache"
+LLM_CACHE_TTL = 3600  # seconds
 
-# AI Analysis Functions
-def analyze_resume(resume_text):
-    """Analyze resume and return structured feedback"""
-    prompt = f"""
-    Analyze this resume and return ONLY a valid JSON object with exactly these fields:
-    - sections_detected: array of strings (sections found in the resume)
-    - missing_sections: array of strings (important sections that are missing)
-    - well_written_sections: array of strings (sections that are well-written)
-    - quality_score: number between 0-100 (overall resume quality)
-    - suggestions: array of strings (specific improvement suggestions)
+@st.cache_resource
+def get_llm_cache():
+    return diskcache.Cache(LLM_CACHE_DIR)
+
+llm_cache = get_llm_cache()
+
+def cache_key(kind, model_name, prompt):
+    return f"{kind}:{model_name}:{hashlib.sha256(prompt.encode()).hexdigest()}"
 
+def generate_text(kind, prompt, on_update=None, generation_config=None, model_name=GEMINI_MODEL):
+    """Generate a response, reusing the cached one for an identical prompt.
+
+    If on_update is given, the response is streamed and on_update is called
+    with the text received so far after every chunk.
+    """
+    key = cache_key(kind, model_name, prompt)
+    cached = llm_cache.get(key)
+    if cached is not None:
+        return cached
+
+    model = get_model(model_name)
+    if on_update is None:
+        response = model.generate_content(prompt, generation_config=generation_config)
+    else:
+        response = model.generate_content(prompt, generation_config=generation_config, stream=True)
+        partial_text = ""
+        for chunk in response:
+            partial_text += chunk.text
+            on_update(partial_text)
+
+    result = response.text.strip()
+    llm_cache.set(key, result, expire=LLM_CACHE_TTL)
+    return result
+
+# AI Analysis Functions
+def build_prompt(resume_text, instructions):
+    """Put the resume first so every call on it shares the same prompt prefix"""
+    return f"""
     Resume:
     {resume_text}
 
-    Return ONLY the JSON object, no other text or explanation.
+    {instructions}
     """
 
+class ResumeFeedback(BaseModel):
+    """Schema Gemini's resume feedback is constrained to"""
+    sections_detected: list[str]
+    missing_sections: list[str]
+    well_written_sections: list[str]
+    quality_score: int
+    suggestions: list[str]
+
+def analyze_resume(resume_text):
+    """Analyze resume and return structured feedback as JSON"""
+    prompt = build_prompt(resume_text, """
+    Analyze the resume above and return a JSON object with these fields:
+    - sections_detected: sections found in the resume
+    - missing_sections: important sections that are missing
+    - well_written_sections: sections that are well-written
+    - quality_score: number between 0-100 (overall resume quality)
+    - suggestions: specific improvement suggestions
+    """)
+    generation_config = {
+        "response_mime_type": "application/json",
+        "response_schema": ResumeFeedback,
+    }
+
     try:
-        response = model.generate_content(prompt)
-        return response.text.strip()
+        return generate_text(
+            "analyze", prompt, generation_config=generation_config, model_name=GEMINI_FEEDBACK_MODEL
+        )
     except Exception as e:
         return f'{{"error": "Failed to analyze resume: {str(e)}"}}'
 
-def improve_resume(resume_text, feedback):
-    """Improve resume based on feedback"""
-    prompt = f"""
-    Improve this resume based on the feedback provided. Keep the candidate's experience intact
-    but improve clarity, grammar, formatting, and overall presentation.
+# Separates the improved resume from the job guidance in the combined response
+JOB_GUIDANCE_MARKER = "=== JOB SEARCH GUIDANCE ==="
 
-    Original Resume:
-    {resume_text}
-
-    Feedback Context:
-    {feedback}
+def split_improvement_response(text):
+    improved_resume, _, job_guidance = text.partition(JOB_GUIDANCE_MARKER)
+    return improved_resume.strip(), job_guidance.strip()
 
-    Return the improved resume as clean, well-formatted text.
-    """
-
-    try:
-        response = model.generate_content(prompt)
-        return response.text.strip()
-    except Exception as e:
-        return f"Error improving resume: {str(e)}"
+def improve_resume_with_guidance(resume_text, on_resume_update=None, on_guidance_update=None):
+    """Improve resume and provide job search guidance in a single call"""
+    prompt = build_prompt(resume_text, f"""
+    First, improve the resume above. Keep the candidate's experience intact
+    but improve clarity, grammar, formatting, and overall presentation.
+    Write the improved resume as clean, well-formatted text.
 
-def get_job_guidance(improved_resume):
-    """Provide job search guidance based on resume"""
-    prompt = f"""
-    Based on this improved resume, provide job search guidance including:
+    Then write a line containing only {JOB_GUIDANCE_MARKER} and, based on the
+    improved resume, provide job search guidance including:
     1) Recommended job titles to search for
     2) Top companies in the candidate's field
     3) Key job boards and websites to use
     4) Networking tips specific to their industry
 
-    Resume:
-    {improved_resume}
+    Provide the guidance as structured, actionable advice in markdown format.
+    """)
 
-    Provide structured, actionable advice in markdown format.
-    """
+    def on_update(partial_text):
+        improved_resume, job_guidance = split_improvement_response(partial_text)
+        if on_resume_update is not None:
+            on_resume_update(improved_resume)
+        if job_guidance and on_guidance_update is not None:
+            on_guidance_update(job_guidance)
 
     try:
-        response = model.generate_content(prompt)
-        return response.text.strip()
+        response_text = generate_text("improve_with_guidance", prompt, on_update)
     except Exception as e:
-        return f"Error generating job guidance: {str(e)}"
+        return f"Error improving resume: {str(e)}", f"Error generating job guidance: {str(e)}"
+
+    improved_resume, job_guidance = split_improvement_response(response_text)
+    if not job_guidance:
+        job_guidance = "Error generating job guidance: the response did not include a guidance section"
+    return improved_resume, job_guidance
 
 # Streamlit UI
 st.title("🚀 Resume Analyzer & Job Finder")
@@ -128,85 +190,78 @@ if run_button and uploaded_file:
     progress_bar = st.progress(0)
     status_text = st.empty()
 
-    # Step 1: Analyze Resume
-    status_text.text("🔍 Analyzing resume...")
-    progress_bar.progress(25)
-
-    feedback_raw = analyze_resume(resume_text)
-
-    # Step 2: Improve Resume
-    status_text.text("✨ Improving resume...")
-    progress_bar.progress(50)
-
-    improved_resume = improve_resume(resume_text, feedback_raw)
+    # Lay out the result sections up front so streamed output appears in place
+    st.subheader("📊 Resume Feedback")
+    feedback_section = st.container()
+    st.subheader("✅ Improved Resume")
+    improved_placeholder = st.empty()
+    download_section = st.container()
+    st.subheader("💼 Job Search Guidance")
+    guidance_placeholder = st.empty()
 
-    # Step 3: Generate Job Guidance
-    status_text.text("💼 Generating job guidance...")
-    progress_bar.progress(75)
+    # Analyze the resume while it is improved and job guidance is generated in one call
+    status_text.text("🔍 Analyzing and improving resume, generating job guidance...")
+    progress_bar.progress(25)
 
-    job_guidance = get_job_guidance(improved_resume)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        feedback_future = executor.submit(analyze_resume, resume_text)
+        improved_resume, job_guidance = improve_resume_with_guidance(
+            resume_text,
+            on_resume_update=improved_placeholder.text,
+            on_guidance_update=guidance_placeholder.markdown,
+        )
+        progress_bar.progress(75)
+        feedback_raw = feedback_future.result()
 
     # Complete
-    progress_bar.progress(100)
-    status_text.text("✅ Analysis complete!")
-    time.sleep(1)
     progress_bar.empty()
     status_text.empty()
+    st.toast("✅ Analysis complete!")
 
     # Display Results
 
     # Resume Feedback
-    st.subheader("📊 Resume Feedback")
-    try:
-        # Try to parse JSON from the raw output
-        raw_output = feedback_raw.strip()
-
-        # Remove any markdown code blocks if present
-        if raw_output.startswith('```json'):
-            raw_output = raw_output.replace('```json', '').replace('```', '').strip()
-        elif raw_output.startswith('```'):
-            raw_output = raw_output.replace('```', '').strip()
-
-        feedback_data = json.loads(raw_output)
-
-        # Display key metrics in a more user-friendly way
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.metric("Quality Score", f"{feedback_data.get('quality_score', 'N/A')}/100")
-        with col2:
-            st.metric("Sections Detected", len(feedback_data.get('sections_detected', [])))
-        with col3:
-            st.metric("Missing Sections", len(feedback_data.get('missing_sections', [])))
-
-        # Detailed feedback
-        with st.expander("📋 Detailed Analysis", expanded=True):
-            st.json(feedback_data)
-
-    except Exception as e:
-        st.warning("⚠️ Could not parse JSON feedback. Showing raw output:")
-        st.text_area("Raw Feedback", feedback_raw, height=200)
-        st.error(f"Error details: {str(e)}")
+    with feedback_section:
+        try:
+            feedback_data = orjson.loads(feedback_raw)
+
+            # Display key metrics in a more user-friendly way
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Quality Score", f"{feedback_data.get('quality_score', 'N/A')}/100")
+            with col2:
+                st.metric("Sections Detected", len(feedback_data.get('sections_detected', [])))
+            with col3:
+                st.metric("Missing Sections", len(feedback_data.get('missing_sections', [])))
+
+            # Detailed feedback
+            with st.expander("📋 Detailed Analysis", expanded=True):
+                st.json(feedback_data)
+
+        except Exception as e:
+            st.warning("⚠️ Could not parse JSON feedback. Showing raw output:")
+            st.text_area("Raw Feedback", feedback_raw, height=200)
+            st.error(f"Error details: {str(e)}")
 
     # Improved Resume
-    st.subheader("✅ Improved Resume")
-    st.text_area("Improved Resume", improved_resume, height=300)
+    improved_placeholder.text_area("Improved Resume", improved_resume, height=300)
 
     # Download button
-    try:
-        save_docx(improved_resume, "improved_resume.docx")
-        with open("improved_resume.docx", "rb") as f:
+    with download_section:
+        try:
+            docx_buffer = io.BytesIO()
+            save_docx(improved_resume, docx_buffer)
             st.download_button(
                 "⬇️ Download Improved Resume",
-                f,
+                docx_buffer.getvalue(),
                 file_name="improved_resume.docx",
                 mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
             )
-    except Exception as e:
-        st.error(f"Error creating download file: {str(e)}")
+        except Exception as e:
+            st.error(f"Error creating download file: {str(e)}")
 
     # Job Search Guidance
-    st.subheader("💼 Job Search Guidance")
-    st.markdown(job_guidance)
+    guidance_placeholder.markdown(job_guidance)
 
 # Sidebar with information
 with st.sidebar:
@@ -0,0 +1,124 @@
+"""Resume file I/O: text extraction from PDF/DOCX uploads and DOCX export"""
+import io
+import os
+import re
+import functools
+import zipfile
+from typing import BinaryIO, Iterator, Union
+from xml.sax.saxutils import escape
+import fitz  # PyMuPDF
+import docx
+from docx import Document
+
+# Resume Extraction Functions
+
+def extract_text_from_pdf(pdf_file: io.BytesIO) -> str:
+    # getbuffer() exposes the upload's bytes without copying them
+    with pdf_file.getbuffer() as buffer, fitz.open(stream=buffer, filetype="pdf") as doc:
+        # Block tuples come straight from MuPDF; index 4 is the text, index 6 is 0 for text blocks
+        return "".join(block[4] for page in doc for block in page.get_text("blocks") if block[6] == 0)
+
+def extract_text_from_docx(docx_file: BinaryIO) -> str:
+    document = Document(docx_file)
+    return "\n".join(p.text for p in document.paragraphs)
+
+# Minimal DOCX package parts, written directly instead of through python-docx
+DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '<Override PartName="/word/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.styles+xml"/>'
+    '</Types>'
+)
+DOCX_PACKAGE_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    '</Relationships>'
+)
+DOCX_DOCUMENT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+    'Target="styles.xml"/>'
+    '</Relationships>'
+)
+DOCX_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<w:styles xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+    '<w:docDefaults><w:rPrDefault><w:rPr>'
+    '<w:rFonts w:ascii="Calibri" w:hAnsi="Calibri" w:eastAsia="Calibri" w:cs="Calibri"/>'
+    '<w:sz w:val="22"/><w:szCs w:val="22"/>'
+    '</w:rPr></w:rPrDefault></w:docDefaults>'
+    '</w:styles>'
+)
+DOCX_DOCUMENT_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+    '<w:body>'
+)
+DOCX_DOCUMENT_END = '</w:body></w:document>'
+# Characters that are not allowed anywhere in an XML 1.0 document
+INVALID_XML_CHARS_RE = re.compile("[^\t\n\r\x20-\ud7ff\ue000-\ufffd\U00010000-\U0010ffff]")
+
+def docx_paragraph(line: str) -> str:
+    runs = escape(INVALID_XML_CHARS_RE.sub("", line)).replace(
+        "\t", '</w:t><w:tab/><w:t xml:space="preserve">'
+    )
+    return f'<w:p><w:r><w:t xml:space="preserve">{runs}</w:t></w:r></w:p>'
+
+def iter_docx_lines(text: str) -> Iterator[str]:
+    """Yield the lines of text one at a time, skipping leading and trailing blank lines"""
+    pending_blank_lines = None  # stays None until the first non-blank line
+    for line in io.StringIO(text):
+        line = line.rstrip("\r\n")
+        if not line.strip():
+            if pending_blank_lines is not None:
+                pending_blank_lines += 1
+            continue
+        for _ in range(pending_blank_lines or 0):
+            yield ""
+        pending_blank_lines = 0
+        yield line
+
+def write_docx(text: str, output: Union[str, BinaryIO]) -> None:
+    """Write text as a .docx, one paragraph per line, without building a python-docx Document"""
+    with zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as docx_zip:
+        docx_zip.writestr("[Content_Types].xml", DOCX_CONTENT_TYPES)
+        docx_zip.writestr("_rels/.rels", DOCX_PACKAGE_RELS)
+        docx_zip.writestr("word/_rels/document.xml.rels", DOCX_DOCUMENT_RELS)
+        docx_zip.writestr("word/styles.xml", DOCX_STYLES)
+        # Stream paragraphs into the archive instead of building the whole document.xml string
+        with io.TextIOWrapper(docx_zip.open("word/document.xml", "w"), encoding="utf-8") as document_xml:
+            document_xml.write(DOCX_DOCUMENT_START)
+            for line in iter_docx_lines(text):
+                document_xml.write(docx_paragraph(line))
+            document_xml.write(DOCX_DOCUMENT_END)
+
+@functools.lru_cache(maxsize=None)
+def get_docx_template() -> bytes:
+    """Read python-docx's default template once per process"""
+    template_path = os.path.join(os.path.dirname(docx.__file__), "templates", "default.docx")
+    with open(template_path, "rb") as template_file:
+        return template_file.read()
+
+def save_docx(text: str, output: Union[str, BinaryIO]) -> None:
+    """Save text as a .docx to a file path or a writable binary file object"""
+    try:
+        write_docx(text, output)
+    except Exception:
+        # Fall back to python-docx if the direct writer fails, discarding any partial output
+        if hasattr(output, "seek"):
+            output.seek(0)
+            output.truncate()
+        doc = Document(io.BytesIO(get_docx_template()))
+        for line in iter_docx_lines(text):
+            doc.add_paragraph(line)
+        doc.save(output)